@@ -1,5 +1,7 @@
 # app/services/user_service.py
 
+import uuid
+
 from fastapi import HTTPException, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -145,6 +147,22 @@ class UserService:
                 detail="Failed to create user.",
             )
 
+    @staticmethod
+    async def _get_user_or_404(db: AsyncSession, user_id: str) -> User:
+        """Fetch a user by id; malformed ids are treated as not found"""
+        try:
+            user_uuid = uuid.UUID(user_id)
+        except ValueError:
+            user = None
+        else:
+            user = await crud_user.get(db, id=user_uuid)
+
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
+        return user
+
     @log_performance("user_service.update_user")
     async def update_user(
         self, db: AsyncSession, *, user_id: str, user_in: UserUpdate, current_user: User
@@ -162,11 +180,7 @@ class UserService:
         )
 
         # Get existing user
-        user = await crud_user.get(db, id=user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-            )
+        user = await self._get_user_or_404(db, user_id)
 
         # Update user
         updated_user = await crud_user.update(db, db_obj=user, obj_in=user_in)
@@ -190,11 +204,7 @@ class UserService:
     ) -> User:
         """Get user profile with data access logging"""
 
-        user = await crud_user.get(db, id=user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-            )
+        user = await self._get_user_or_404(db, user_id)
 
         # Log data access for audit
         audit.log_data_access(
@@ -5,59 +5,271 @@ This module provides async database fixtures, authentication helpers,
 and test utilities for comprehensive testing of the FastAPI application.
 """
 
+import functools
 import pytest
 import pytest_asyncio
+from contextlib import asynccontextmanager
+from datetime import timedelta
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import create_async_engine
+from passlib.context import CryptContext
+from pathlib import Path
+from sqlalchemy import event, make_url, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, StaticPool
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
-from typing import AsyncGenerator
+from types import MappingProxyType
+from typing import AsyncGenerator, Generator, Mapping
 import os
 
 from app.main import app
 from app.core.config import settings
 from app.models.user import User
 from app.schemas.user import UserCreate
-from app.crud.user import user as crud_user
+from app.core import security
 from app.core.security import create_access_token
 from app.api.deps import get_session
 
 
-# Configure test database URL
-TEST_DATABASE_URL = os.getenv("DATABASE_URL_TEST") or settings.DATABASE_URL_TEST
+# Configure test database URL. Defaults to a shared in-memory SQLite database;
+# set DATABASE_URL_TEST (environment or .env) to run against PostgreSQL instead.
+# Settings always has a placeholder value, so only an explicitly set one counts.
+TEST_DATABASE_URL = (
+    settings.DATABASE_URL_TEST
+    if "DATABASE_URL_TEST" in settings.model_fields_set
+    else "sqlite+aiosqlite:///:memory:"
+)
+
+# Set by pytest-xdist in each worker process ("gw0", "gw1", ...).
+XDIST_WORKER = os.getenv("PYTEST_XDIST_WORKER")
+
+# bcrypt dominates test runtime even at its minimum cost. Tests hash with a
+# single PBKDF2 round instead; hashes are still "$"-prefixed modular-crypt
+# strings, so crud_user.create recognises them as already hashed.
+TEST_PWD_CONTEXT = CryptContext(schemes=["pbkdf2_sha256"], pbkdf2_sha256__rounds=1)
+
+# Every test user shares one password hash computed at import time.
+TEST_PASSWORD = "testpassword123"
+TEST_PASSWORD_HASH = TEST_PWD_CONTEXT.hash(TEST_PASSWORD)
+
+
+def _named_on_command_line(
+    item: pytest.Item, node_args: list[tuple[Path, str]]
+) -> bool:
+    """Return True if a path::name argument selects this item explicitly."""
+    _, _, name = item.nodeid.partition("::")
+    return any(
+        item.path == path
+        and (name == target or name.startswith((f"{target}::", f"{target}[")))
+        for path, target in node_args
+    )
 
 
-@pytest_asyncio.fixture(scope="function")
-async def db_session() -> AsyncGenerator[AsyncSession, None]:
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: list[pytest.Item]
+) -> None:
+    """Deselect rate limiting tests unless -m or a node ID names them."""
+    if "ratelimit" in config.getoption("markexpr"):
+        return
+
+    invocation_dir = config.invocation_params.dir
+    node_args = [
+        ((invocation_dir / path).resolve(), target)
+        for path, sep, target in (arg.partition("::") for arg in config.args)
+        if sep
+    ]
+
+    selected, deselected = [], []
+    for item in items:
+        if item.get_closest_marker("ratelimit") is None or _named_on_command_line(
+            item, node_args
+        ):
+            selected.append(item)
+        else:
+            deselected.append(item)
+
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _fast_password_hashing() -> Generator[None, None, None]:
+    """Route hash_password/verify_password through the cheap test context."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(security, "pwd_context", TEST_PWD_CONTEXT)
+        yield
+
+
+def worker_database_url(url: str, worker: str | None) -> str:
     """
-    Create a fresh database session and tables for each test.
-    This approach avoids event loop conflicts by keeping everything simple.
+    Give each pytest-xdist worker its own database.
+
+    In-memory SQLite is already private to a process; any other database name
+    gets the worker id appended so workers never share tables.
     """
-    # Create a simple engine without pooling
-    engine = create_async_engine(TEST_DATABASE_URL, echo=False)
+    parsed = make_url(url)
+    if worker is None or parsed.database in (None, "", ":memory:"):
+        return url
 
-    try:
-        # Create tables
-        async with engine.begin() as conn:
-            await conn.run_sync(SQLModel.metadata.create_all)
+    if parsed.get_backend_name() == "sqlite":
+        path = Path(parsed.database)
+        database = str(path.with_stem(f"{path.stem}_{worker}"))
+    else:
+        database = f"{parsed.database}_{worker}"
+
+    return parsed.set(database=database).render_as_string(hide_password=False)
 
-        # Create session
-        async with AsyncSession(engine) as session:
-            yield session
 
+async def create_database_if_missing(url: str) -> None:
+    """Create a per-worker PostgreSQL database on first use."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "postgresql":
+        return
+
+    admin_engine = create_async_engine(
+        parsed.set(database="postgres"),
+        isolation_level="AUTOCOMMIT",
+        poolclass=NullPool,
+    )
+    try:
+        async with admin_engine.connect() as conn:
+            exists = await conn.scalar(
+                text("SELECT 1 FROM pg_database WHERE datname = :name"),
+                {"name": parsed.database},
+            )
+            if not exists:
+                await conn.execute(text(f'CREATE DATABASE "{parsed.database}"'))
     finally:
-        # Clean up tables
-        async with engine.begin() as conn:
-            await conn.run_sync(SQLModel.metadata.drop_all)
+        await admin_engine.dispose()
+
+
+def create_test_engine(url: str) -> AsyncEngine:
+    """Create the async engine used by the test session."""
+    if not url.startswith("sqlite"):
+        # Keep a small fixed pool open for the whole session so tests reuse
+        # server connections instead of reconnecting; the suite holds at most
+        # a couple of connections at a time.
+        return create_async_engine(
+            url,
+            echo=False,
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=5,
+            max_overflow=0,
+            pool_pre_ping=False,
+        )
+
+    # StaticPool keeps a single connection so every session sees the same
+    # in-memory database.
+    engine = create_async_engine(
+        url,
+        echo=False,
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+
+    # The sqlite3 driver manages transactions on its own, which breaks
+    # SAVEPOINTs. Let SQLAlchemy emit BEGIN itself instead.
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    return engine
+
+
+@asynccontextmanager
+async def engine_with_schema(url: str) -> AsyncGenerator[AsyncEngine, None]:
+    """Create an engine with all tables, dropping them again on exit."""
+    engine = create_test_engine(url)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    yield engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
 
-        # Dispose engine
-        await engine.dispose()
+    await engine.dispose()
+
+
+@asynccontextmanager
+async def outer_transaction(
+    engine: AsyncEngine,
+) -> AsyncGenerator[AsyncConnection, None]:
+    """Hold a connection inside a transaction that is rolled back on exit."""
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        yield conn
+        await transaction.rollback()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def engine() -> AsyncGenerator[AsyncEngine, None]:
+    """
+    Create the test engine and database schema once per test session.
+    """
+    url = worker_database_url(TEST_DATABASE_URL, XDIST_WORKER)
+    if XDIST_WORKER is not None:
+        await create_database_if_missing(url)
+
+    async with engine_with_schema(url) as engine:
+        yield engine
+
+
+@pytest_asyncio.fixture(scope="module")
+async def db_connection(engine: AsyncEngine) -> AsyncGenerator[AsyncConnection, None]:
+    """
+    Hold one connection per test module inside an outer transaction.
+
+    Rows created by module-scoped fixtures live in this transaction and are
+    rolled back once the module finishes.
+    """
+    async with outer_transaction(engine) as conn:
+        yield conn
+
+
+@pytest_asyncio.fixture(scope="function")
+async def db_session(
+    db_connection: AsyncConnection,
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Provide a database session wrapped in a SAVEPOINT that is rolled back
+    after each test. Commits made by the code under test only release inner
+    SAVEPOINTs, so no data leaks between tests.
+    """
+    savepoint = await db_connection.begin_nested()
+
+    async with AsyncSession(
+        bind=db_connection, join_transaction_mode="create_savepoint"
+    ) as session:
+        yield session
+
+    await savepoint.rollback()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def http_client() -> AsyncGenerator[AsyncClient, None]:
+    """
+    Create one in-process HTTP client per test module.
+    Requests go straight to the ASGI app, without a server or thread.
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as test_client:
+        yield test_client
 
 
 @pytest_asyncio.fixture
-async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
+async def client(
+    http_client: AsyncClient, db_session: AsyncSession
+) -> AsyncGenerator[AsyncClient, None]:
     """
-    Create an HTTP client for testing FastAPI endpoints.
+    Provide the module's HTTP client for testing FastAPI endpoints.
     Overrides the database dependency to use the test session.
     """
 
@@ -66,75 +278,112 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
 
     app.dependency_overrides[get_session] = override_get_session
 
-    async with AsyncClient(
-        transport=ASGITransport(app=app), base_url="http://test"
-    ) as test_client:
-        yield test_client
+    yield http_client
 
-    # Clean up dependency override
+    # Clean up dependency override and any cookies set by the test
     app.dependency_overrides.clear()
+    http_client.cookies.clear()
+
+
+@pytest.fixture(scope="session")
+def test_password_hash() -> str:
+    """Pre-computed hash of TEST_PASSWORD for tests that build User rows."""
+    return TEST_PASSWORD_HASH
+
+
+async def _create_user_row(session: AsyncSession, **fields) -> User:
+    """Insert a user with the pre-computed test password hash."""
+    user = User(hashed_password=TEST_PASSWORD_HASH, **fields)
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    return user
+
+
+async def insert_module_test_user(connection: AsyncConnection) -> User:
+    """Insert the regular test user on a module connection."""
+    async with AsyncSession(
+        bind=connection,
+        join_transaction_mode="create_savepoint",
+        expire_on_commit=False,
+    ) as session:
+        return await _create_user_row(
+            session, email="testuser@example.com", full_name="Test User"
+        )
+
+
+@pytest_asyncio.fixture(scope="module")
+async def module_test_user(db_connection: AsyncConnection) -> User:
+    """Insert the regular test user once per module, outside any test SAVEPOINT."""
+    return await insert_module_test_user(db_connection)
+
+
+@pytest.fixture(scope="class")
+def test_user_id(module_test_user: User) -> str:
+    """The test user's id as a string, formatted once per class."""
+    return str(module_test_user.id)
 
 
 @pytest_asyncio.fixture
-async def test_user(db_session: AsyncSession) -> User:
+async def test_user(db_session: AsyncSession, module_test_user: User) -> User:
     """Create a test user for authentication tests."""
-    user_data = UserCreate(
-        email="testuser@example.com", full_name="Test User", password="testpassword123"
-    )
-    return await crud_user.create(db_session, obj_in=user_data)
+    # Attach a per-test copy so changes made by the test roll back with it
+    return await db_session.merge(module_test_user)
 
 
 @pytest_asyncio.fixture
 async def test_inactive_user(db_session: AsyncSession) -> User:
     """Create an inactive test user."""
-    user_data = UserCreate(
+    return await _create_user_row(
+        db_session,
         email="inactive@example.com",
         full_name="Inactive User",
-        password="testpassword123",
+        is_active=False,
     )
-    user = await crud_user.create(db_session, obj_in=user_data)
-    # Make the user inactive
-    user.is_active = False
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
-    return user
 
 
 @pytest_asyncio.fixture
 async def test_superuser(db_session: AsyncSession) -> User:
     """Create a superuser for admin tests."""
-    user_data = UserCreate(
-        email="admin@example.com", full_name="Admin User", password="adminpassword123"
+    return await _create_user_row(
+        db_session,
+        email="admin@example.com",
+        full_name="Admin User",
+        is_superuser=True,
     )
-    user = await crud_user.create(db_session, obj_in=user_data)
-    # Make the user a superuser
-    user.is_superuser = True
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
-    return user
+
+
+@functools.cache
+def bearer_headers(email: str) -> Mapping[str, str]:
+    """
+    Build read-only bearer headers for a user email.
+
+    Tokens only encode the email, so each one is signed once per test session
+    and shared by every test that authenticates as that user.
+    """
+    token = create_access_token(
+        data={"sub": email},
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    return MappingProxyType({"Authorization": f"Bearer {token}"})
 
 
 @pytest_asyncio.fixture
-async def auth_headers(test_user: User) -> dict[str, str]:
+async def auth_headers(test_user: User) -> Mapping[str, str]:
     """Create authentication headers for API tests."""
-    token = create_access_token(data={"sub": test_user.email})
-    return {"Authorization": f"Bearer {token}"}
+    return bearer_headers(test_user.email)
 
 
 @pytest_asyncio.fixture
-async def admin_headers(test_superuser: User) -> dict[str, str]:
+async def admin_headers(test_superuser: User) -> Mapping[str, str]:
     """Create admin authentication headers for API tests."""
-    token = create_access_token(data={"sub": test_superuser.email})
-    return {"Authorization": f"Bearer {token}"}
+    return bearer_headers(test_superuser.email)
 
 
 @pytest_asyncio.fixture
-async def inactive_auth_headers(test_inactive_user: User) -> dict[str, str]:
+async def inactive_auth_headers(test_inactive_user: User) -> Mapping[str, str]:
     """Create authentication headers for inactive user tests."""
-    token = create_access_token(data={"sub": test_inactive_user.email})
-    return {"Authorization": f"Bearer {token}"}
+    return bearer_headers(test_inactive_user.email)
 
 
 @pytest.fixture
@@ -143,6 +392,55 @@ def invalid_auth_headers() -> dict[str, str]:
     return {"Authorization": "Bearer invalid.jwt.token"}
 
 
+class CallRecorder:
+    """Plain callable that records each call as an (args, kwargs) pair."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+
+    def reset(self) -> None:
+        self.calls.clear()
+
+
+class RecordingLogger:
+    """Minimal stand-in for a module logger that records calls per level."""
+
+    def __init__(self):
+        self.debug = CallRecorder()
+        self.info = CallRecorder()
+        self.warning = CallRecorder()
+        self.error = CallRecorder()
+
+    def reset(self) -> None:
+        for level in (self.debug, self.info, self.warning, self.error):
+            level.reset()
+
+
+AUDIT_FUNCTIONS = (
+    "log_auth_attempt",
+    "log_user_action",
+    "log_data_access",
+    "log_security_event",
+)
+
+
+def install_audit_recorders(mp: pytest.MonkeyPatch) -> dict[str, CallRecorder]:
+    """Replace every app.core.logging.audit helper with a CallRecorder."""
+    recorders = {name: CallRecorder() for name in AUDIT_FUNCTIONS}
+    for name, recorder in recorders.items():
+        mp.setattr(f"app.core.logging.audit.{name}", recorder)
+    return recorders
+
+
+@pytest.fixture
+def audit_calls(monkeypatch: pytest.MonkeyPatch) -> dict[str, CallRecorder]:
+    """Record audit helper calls for one test, keyed by function name."""
+    return install_audit_recorders(monkeypatch)
+
+
 class TestUtils:
     """Utility class for common test assertions and helpers."""
 
@@ -177,14 +475,23 @@ def test_utils() -> TestUtils:
 
 
 # Test data fixtures
+USER_CREATE_DATA = {
+    "email": "newuser@example.com",
+    "full_name": "New User",
+    "password": "testpassword123",
+}
+
+
 @pytest.fixture
 def user_create_data() -> dict:
     """Standard user creation data for tests."""
-    return {
-        "email": "newuser@example.com",
-        "full_name": "New User",
-        "password": "testpassword123",
-    }
+    return dict(USER_CREATE_DATA)
+
+
+@pytest.fixture(scope="session")
+def user_create_model() -> UserCreate:
+    """Standard user creation data, validated once as a UserCreate schema."""
+    return UserCreate(**USER_CREATE_DATA)
 
 
 @pytest.fixture
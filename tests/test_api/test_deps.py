@@ -5,8 +5,10 @@ Tests for FastAPI dependencies including authentication, pagination, and databas
 """
 
 import pytest
-from unittest.mock import AsyncMock, patch
+from datetime import timedelta
+from unittest.mock import patch
 from fastapi import HTTPException
+from pydantic import ValidationError
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.api.deps import (
@@ -19,6 +21,7 @@ from app.api.deps import (
 )
 from app.models.user import User
 from app.core.security import create_access_token
+from tests.conftest import CallRecorder, RecordingLogger
 
 
 @pytest.mark.unit
@@ -49,70 +52,36 @@ class TestAuthenticationDependencies:
         # Create valid token
         token = create_access_token(data={"sub": test_user.email})
 
-        # Mock the database session dependency
-        with patch("app.api.deps.get_session") as mock_get_session:
-            mock_get_session.return_value = db_session
-
-            user = await get_current_user(db_session, token)
-
-            assert user is not None
-            assert user.email == test_user.email
-            assert user.id == test_user.id
-
-    async def test_get_current_user_invalid_token(self, db_session: AsyncSession):
-        """Test getting current user with invalid token."""
-        invalid_token = "invalid.jwt.token"
-
-        with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(db_session, invalid_token)
-
-        assert exc_info.value.status_code == 401
-        assert "Could not validate credentials" in exc_info.value.detail
-
-    async def test_get_current_user_malformed_token(self, db_session: AsyncSession):
-        """Test getting current user with malformed token."""
-        malformed_token = "not.a.valid.jwt"
-
-        with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(db_session, malformed_token)
-
-        assert exc_info.value.status_code == 401
-        assert "Could not validate credentials" in exc_info.value.detail
-
-    async def test_get_current_user_expired_token(
-        self, db_session: AsyncSession, test_user: User
-    ):
-        """Test getting current user with expired token."""
-        from datetime import timedelta
-
-        # Create expired token
-        expired_token = create_access_token(
-            data={"sub": test_user.email}, expires_delta=timedelta(minutes=-30)
-        )
-
-        with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(db_session, expired_token)
-
-        assert exc_info.value.status_code == 401
-        assert "Could not validate credentials" in exc_info.value.detail
+        user = await get_current_user(db_session, token)
 
-    async def test_get_current_user_token_missing_subject(
-        self, db_session: AsyncSession
+        assert user is not None
+        assert user.email == test_user.email
+        assert user.id == test_user.id
+
+    @pytest.mark.parametrize(
+        "token_factory",
+        [
+            lambda user: "invalid.jwt.token",
+            lambda user: "not.a.valid.jwt",
+            lambda user: create_access_token(data={"user_id": "123"}),
+            lambda user: create_access_token(data={"sub": "nonexistent@example.com"}),
+            lambda user: create_access_token(
+                data={"sub": user.email}, expires_delta=timedelta(minutes=-30)
+            ),
+        ],
+        ids=[
+            "invalid_token",
+            "malformed_token",
+            "token_missing_subject",
+            "nonexistent_user",
+            "expired_token",
+        ],
+    )
+    async def test_get_current_user_rejects_token(
+        self, db_session: AsyncSession, test_user: User, token_factory
     ):
-        """Test getting current user with token missing subject."""
-        # Create token without 'sub' field
-        token = create_access_token(data={"user_id": "123"})  # Wrong field
-
-        with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(db_session, token)
-
-        assert exc_info.value.status_code == 401
-        assert "Could not validate credentials" in exc_info.value.detail
-
-    async def test_get_current_user_nonexistent_user(self, db_session: AsyncSession):
-        """Test getting current user for non-existent user."""
-        # Create token for non-existent user
-        token = create_access_token(data={"sub": "nonexistent@example.com"})
+        """Test that unusable tokens are rejected with a 401."""
+        token = token_factory(test_user)
 
         with pytest.raises(HTTPException) as exc_info:
             await get_current_user(db_session, token)
@@ -174,65 +143,27 @@ class TestAuthenticationDependencies:
 class TestPaginationDependency:
     """Test pagination parameter dependency."""
 
-    def test_get_pagination_params_default(self):
-        """Test pagination params with default values."""
-        # Call with default values since this is testing the function directly
-        params = get_pagination_params(skip=0, limit=100)
+    @pytest.mark.parametrize(
+        "skip, limit",
+        [(0, 100), (20, 50), (0, 1), (100, 200), (10, 50), (0, 200)],
+    )
+    def test_get_pagination_params_valid(self, skip: int, limit: int):
+        """Test pagination params with valid values."""
+        params = get_pagination_params(skip=skip, limit=limit)
 
         assert isinstance(params, PaginationParams)
-        assert params.skip == 0
-        assert params.limit == 100
-
-    def test_get_pagination_params_custom(self):
-        """Test pagination params with custom values."""
-        params = get_pagination_params(skip=20, limit=50)
-
-        assert params.skip == 20
-        assert params.limit == 50
-
-    def test_get_pagination_params_validation(self):
-        """Test pagination params validation."""
-        # Test valid values
-        params = get_pagination_params(skip=0, limit=1)
-        assert params.skip == 0
-        assert params.limit == 1
-
-        params = get_pagination_params(skip=100, limit=200)
-        assert params.skip == 100
-        assert params.limit == 200
-
-    def test_pagination_params_model_validation(self):
-        """Test PaginationParams model validation."""
-        # Valid params
-        params = PaginationParams(skip=10, limit=50)
-        assert params.skip == 10
-        assert params.limit == 50
-
-        # Test with minimum values
-        params = PaginationParams(skip=0, limit=1)
-        assert params.skip == 0
-        assert params.limit == 1
-
-        # Test with maximum limit
-        params = PaginationParams(skip=0, limit=200)
-        assert params.skip == 0
-        assert params.limit == 200
-
-    def test_pagination_params_invalid_values(self):
+        assert params.skip == skip
+        assert params.limit == limit
+
+    @pytest.mark.parametrize(
+        "skip, limit",
+        [(-1, 100), (0, 0), (0, 300)],
+        ids=["negative_skip", "zero_limit", "limit_too_high"],
+    )
+    def test_get_pagination_params_invalid(self, skip: int, limit: int):
         """Test PaginationParams with invalid values."""
-        from pydantic import ValidationError
-
-        # Negative skip
         with pytest.raises(ValidationError):
-            PaginationParams(skip=-1, limit=100)
-
-        # Zero limit
-        with pytest.raises(ValidationError):
-            PaginationParams(skip=0, limit=0)
-
-        # Limit too high
-        with pytest.raises(ValidationError):
-            PaginationParams(skip=0, limit=300)
+            get_pagination_params(skip=skip, limit=limit)
 
 
 @pytest.mark.integration
@@ -241,48 +172,54 @@ class TestDependencyIntegration:
     """Test dependencies working together in integration scenarios."""
 
     async def test_auth_dependency_with_logging(
-        self, db_session: AsyncSession, test_user: User
+        self,
+        monkeypatch,
+        db_session: AsyncSession,
+        test_user: User,
+        test_user_id: str,
+        audit_calls: dict[str, CallRecorder],
     ):
         """Test that authentication dependency triggers proper logging."""
         token = create_access_token(data={"sub": test_user.email})
 
-        with (
-            patch("app.api.deps.logger") as mock_logger,
-            patch("app.core.logging.audit.log_data_access") as mock_log_access,
-        ):
-            user = await get_current_user(db_session, token)
+        stub = RecordingLogger()
+        monkeypatch.setattr("app.api.deps.logger", stub)
 
-            assert user.email == test_user.email
-
-            # Verify logger.debug was called for successful authentication
-            mock_logger.debug.assert_called()
-            mock_log_access.assert_called()
+        user = await get_current_user(db_session, token)
 
-            # Check log_data_access call
-            access_call = mock_log_access.call_args
-            assert access_call[1]["user_id"] == str(test_user.id)
-            assert access_call[1]["resource_type"] == "user_authentication"
-            assert access_call[1]["operation"] == "token_validation"
+        assert user.email == test_user.email
 
-    async def test_admin_dependency_security_logging(self, test_user: User):
+        # Verify logger.debug was called for successful authentication
+        assert stub.debug.calls
+        assert audit_calls["log_data_access"].calls
+
+        # Check log_data_access call
+        _, access_call = audit_calls["log_data_access"].calls[-1]
+        assert access_call["user_id"] == test_user_id
+        assert access_call["resource_type"] == "user_authentication"
+        assert access_call["operation"] == "token_validation"
+
+    async def test_admin_dependency_security_logging(
+        self,
+        monkeypatch,
+        test_user: User,
+        audit_calls: dict[str, CallRecorder],
+    ):
         """Test that admin access denial triggers security logging."""
-        with (
-            patch("app.core.logging.get_logger") as mock_get_logger,
-            patch("app.core.logging.audit.log_security_event") as mock_log_security,
-        ):
-            mock_logger = AsyncMock()
-            mock_get_logger.return_value = mock_logger
-
-            with pytest.raises(HTTPException):
-                await get_current_admin_user(test_user)
-
-            # Verify security logging was called
-            mock_log_security.assert_called()
-
-            # Check security event details
-            security_call = mock_log_security.call_args
-            assert security_call[0][0] == "unauthorized_admin_access"
-            assert security_call[1]["severity"] == "high"
+        stub = RecordingLogger()
+        monkeypatch.setattr("app.api.deps.logger", stub)
+
+        with pytest.raises(HTTPException):
+            await get_current_admin_user(test_user)
+
+        # Verify the denial was logged and a security event recorded
+        assert stub.warning.calls
+        assert audit_calls["log_security_event"].calls
+
+        # Check security event details
+        args, kwargs = audit_calls["log_security_event"].calls[-1]
+        assert args[0] == "unauthorized_admin_access"
+        assert kwargs["severity"] == "high"
 
     async def test_dependency_error_propagation(self, db_session: AsyncSession):
         """Test that dependency errors propagate correctly."""
@@ -85,6 +85,7 @@ class TestUserRegistration:
 
         assert response.status_code == 422  # Validation error from Pydantic
 
+    @pytest.mark.ratelimit
     async def test_register_user_rate_limiting(self, client: AsyncClient):
         """Test that user registration has rate limiting."""
         # Note: This test assumes rate limiting is configured
@@ -111,7 +112,11 @@ class TestUserProfile:
     """Test user profile endpoints."""
 
     async def test_get_my_profile_success(
-        self, client: AsyncClient, auth_headers: dict, test_user: User
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        test_user: User,
+        test_user_id: str,
     ):
         """Test getting current user's profile."""
         response = await client.get("/api/v1/users/me", headers=auth_headers)
@@ -121,7 +126,7 @@ class TestUserProfile:
 
         assert "data" in data
         user_data = data["data"]
-        assert user_data["id"] == str(test_user.id)
+        assert user_data["id"] == test_user_id
         assert user_data["email"] == test_user.email
         assert user_data["full_name"] == test_user.full_name
 
@@ -385,6 +390,7 @@ class TestUserAPIValidation:
         assert "detail" in data
         assert isinstance(data["detail"], list)  # Validation errors are lists
 
+    @pytest.mark.ratelimit
     async def test_api_rate_limiting_headers(self, client: AsyncClient):
         """Test that rate limiting adds appropriate headers."""
         response = await client.post(
@@ -0,0 +1,56 @@
+"""
+Logging test fixtures.
+
+Provides a shared mock for the loguru logger and recorders for the audit helpers.
+"""
+
+import pytest
+from typing import Generator, NamedTuple
+from unittest.mock import MagicMock, patch
+
+from tests.conftest import CallRecorder, RecordingLogger, install_audit_recorders
+
+
+class AuditRecorders(NamedTuple):
+    """Recorders installed by the audit_recorders fixture."""
+
+    service_logger: RecordingLogger
+    calls: dict[str, CallRecorder]
+
+
+@pytest.fixture(scope="class")
+def _patched_audit_logger() -> Generator[MagicMock, None, None]:
+    """Patch app.core.logging.logger once for every test in a class."""
+    with patch("app.core.logging.logger") as mock_logger:
+        yield mock_logger
+
+
+@pytest.fixture
+def mock_audit_logger(
+    _patched_audit_logger: MagicMock,
+) -> Generator[MagicMock, None, None]:
+    """Provide the class-wide logger mock, reset after each test."""
+    yield _patched_audit_logger
+    _patched_audit_logger.reset_mock()
+
+
+@pytest.fixture(scope="class")
+def _patched_audit_calls() -> Generator[AuditRecorders, None, None]:
+    """Record the service logger and audit helpers once for every test in a class."""
+    with pytest.MonkeyPatch.context() as mp:
+        service_logger = RecordingLogger()
+        mp.setattr("app.services.user.logger", service_logger)
+        yield AuditRecorders(
+            service_logger=service_logger, calls=install_audit_recorders(mp)
+        )
+
+
+@pytest.fixture
+def audit_recorders(
+    _patched_audit_calls: AuditRecorders,
+) -> Generator[AuditRecorders, None, None]:
+    """Provide the class-wide audit recorders, reset after each test."""
+    yield _patched_audit_calls
+    _patched_audit_calls.service_logger.reset()
+    for recorder in _patched_audit_calls.calls.values():
+        recorder.reset()
@@ -0,0 +1,84 @@
+"""
+Service test fixtures.
+
+Fake CRUD results and per-class database overrides for service-level tests.
+"""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from typing import AsyncGenerator
+from unittest.mock import AsyncMock
+
+from app.models.user import User
+from tests.conftest import (
+    TEST_DATABASE_URL,
+    engine_with_schema,
+    insert_module_test_user,
+    outer_transaction,
+)
+
+# Unit-marked service classes only exercise business logic, so they run on
+# in-memory SQLite even when DATABASE_URL_TEST points at PostgreSQL.
+UNIT_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+
+@pytest.fixture(scope="session")
+def prebuilt_user(test_password_hash: str) -> User:
+    """An unsaved user returned by the fake CRUD layer."""
+    return User(
+        email="prebuilt@example.com",
+        full_name="Prebuilt User",
+        hashed_password=test_password_hash,
+    )
+
+
+@pytest.fixture
+def fast_crud(monkeypatch: pytest.MonkeyPatch, prebuilt_user: User) -> User:
+    """
+    Replace the CRUD calls made by the user service with canned results.
+
+    For tests that only check logging around a service call; no database
+    session is needed. Returns the user every lookup and write resolves to.
+    """
+    monkeypatch.setattr("app.crud.user.user.get_by_email", AsyncMock(return_value=None))
+    monkeypatch.setattr("app.crud.user.user.get", AsyncMock(return_value=prebuilt_user))
+    monkeypatch.setattr(
+        "app.crud.user.user.create", AsyncMock(return_value=prebuilt_user)
+    )
+    monkeypatch.setattr(
+        "app.crud.user.user.update", AsyncMock(return_value=prebuilt_user)
+    )
+    return prebuilt_user
+
+
+@pytest_asyncio.fixture(scope="session")
+async def unit_engine(engine: AsyncEngine) -> AsyncGenerator[AsyncEngine, None]:
+    """In-memory SQLite engine; the main engine when it already is one."""
+    if TEST_DATABASE_URL == UNIT_DATABASE_URL:
+        yield engine
+        return
+
+    async with engine_with_schema(UNIT_DATABASE_URL) as unit_engine:
+        yield unit_engine
+
+
+@pytest_asyncio.fixture(scope="class")
+async def db_connection(
+    request: pytest.FixtureRequest, engine: AsyncEngine, unit_engine: AsyncEngine
+) -> AsyncGenerator[AsyncConnection, None]:
+    """
+    Per-class override of the root db_connection.
+
+    Classes marked unit get a connection on unit_engine; the rest keep the
+    configured test database.
+    """
+    is_unit = request.node.get_closest_marker("unit") is not None
+    async with outer_transaction(unit_engine if is_unit else engine) as conn:
+        yield conn
+
+
+@pytest_asyncio.fixture(scope="class")
+async def module_test_user(db_connection: AsyncConnection) -> User:
+    """Per-class override of the root module_test_user, on this db_connection."""
+    return await insert_module_test_user(db_connection)
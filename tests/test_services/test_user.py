@@ -5,7 +5,7 @@ Tests for user business logic, validation, and service operations.
 """
 
 import pytest
-from unittest.mock import patch
+import uuid
 from fastapi import HTTPException
 from pydantic_core import ValidationError
 from sqlmodel.ext.asyncio.session import AsyncSession
@@ -13,6 +13,36 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from app.services.user import user_service
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
+from tests.conftest import CallRecorder
+
+# An ID that never belongs to a stored user, generated once at import
+_UNKNOWN_USER_ID = str(uuid.uuid4())
+
+
+@pytest.mark.unit
+class TestUserSchemaValidation:
+    """Test user input validation that happens before the service is called."""
+
+    @pytest.mark.parametrize(
+        "email",
+        ["", "   ", "invalid-email"],
+        ids=["empty", "whitespace", "malformed"],
+    )
+    def test_create_user_invalid_email(self, email: str):
+        """Test user creation with an invalid email fails at schema validation level."""
+        # This should fail at Pydantic schema validation level, before any DB work
+        with pytest.raises(ValidationError):
+            UserCreate(email=email, full_name="Test User", password="password123")
+
+    def test_user_create_schema_trims_whitespace(self):
+        """Test that the schema trims whitespace around the email."""
+        user_data = UserCreate(
+            email="  test@example.com  ",
+            full_name="Test User",
+            password="password123",
+        )
+
+        assert user_data.email == "test@example.com"
 
 
 @pytest.mark.unit
@@ -21,15 +51,22 @@ class TestUserService:
     """Test user service business logic."""
 
     async def test_create_user_success(
-        self, db_session: AsyncSession, user_create_data: dict
+        self, db_session: AsyncSession, user_create_model: UserCreate
     ):
         """Test successful user creation with all validations."""
-        user_data = UserCreate(**user_create_data)
+        user_data = user_create_model
+        # Pad the fields (model_copy skips validation) to cover service trimming
+        padded = user_data.model_copy(
+            update={
+                "email": f"  {user_data.email}  ",
+                "full_name": f"  {user_data.full_name}  ",
+            }
+        )
 
-        created_user = await user_service.create_user(db_session, user_in=user_data)
+        created_user = await user_service.create_user(db_session, user_in=padded)
 
-        assert created_user.email == user_data.email
-        assert created_user.full_name == user_data.full_name
+        assert created_user.email == user_data.email  # Trimmed
+        assert created_user.full_name == user_data.full_name  # Trimmed
         assert created_user.is_active is True
         assert created_user.is_superuser is False
         assert created_user.hashed_password != user_data.password  # Should be hashed
@@ -50,86 +87,45 @@ class TestUserService:
         assert exc_info.value.status_code == 400
         assert "already exists" in exc_info.value.detail
 
-    async def test_create_user_empty_email(self, db_session: AsyncSession):
-        """Test user creation with empty email fails at schema validation level."""
-        # This should fail at Pydantic schema validation level
-        with pytest.raises(ValidationError):
-            UserCreate(email="", full_name="Test User", password="password123")
-
-    async def test_create_user_whitespace_email(self, db_session: AsyncSession):
-        """Test user creation with whitespace-only email fails at schema validation level."""
-        # This should fail at Pydantic schema validation level
-        with pytest.raises(ValidationError):
-            UserCreate(email="   ", full_name="Test User", password="password123")
-
-    async def test_create_user_empty_full_name(self, db_session: AsyncSession):
-        """Test user creation with empty full name fails."""
-        user_data = UserCreate(
-            email="test@example.com", full_name="", password="password123"
-        )
-
-        with pytest.raises(HTTPException) as exc_info:
-            await user_service.create_user(db_session, user_in=user_data)
-
-        assert exc_info.value.status_code == 400
-        assert "Full name is required" in exc_info.value.detail
-
-    async def test_create_user_whitespace_full_name(self, db_session: AsyncSession):
-        """Test user creation with whitespace-only full name fails."""
-        user_data = UserCreate(
-            email="test@example.com", full_name="   ", password="password123"
-        )
-
-        with pytest.raises(HTTPException) as exc_info:
-            await user_service.create_user(db_session, user_in=user_data)
-
-        assert exc_info.value.status_code == 400
-        assert "Full name is required" in exc_info.value.detail
-
-    async def test_create_user_empty_password(self, db_session: AsyncSession):
-        """Test user creation with empty password fails."""
-        user_data = UserCreate(
-            email="test@example.com", full_name="Test User", password=""
-        )
-
-        with pytest.raises(HTTPException) as exc_info:
-            await user_service.create_user(db_session, user_in=user_data)
-
-        assert exc_info.value.status_code == 400
-        assert "Password is required" in exc_info.value.detail
-
-    async def test_create_user_whitespace_password(self, db_session: AsyncSession):
-        """Test user creation with whitespace-only password fails."""
+    @pytest.mark.parametrize(
+        "full_name, password, detail",
+        [
+            ("", "password123", "Full name is required"),
+            ("   ", "password123", "Full name is required"),
+            ("Test User", "", "Password is required"),
+            ("Test User", "   ", "Password is required"),
+        ],
+        ids=[
+            "empty_full_name",
+            "whitespace_full_name",
+            "empty_password",
+            "whitespace_password",
+        ],
+    )
+    async def test_create_user_missing_required_field(
+        self, db_session: AsyncSession, full_name: str, password: str, detail: str
+    ):
+        """Test user creation with a blank full name or password fails."""
         user_data = UserCreate(
-            email="test@example.com", full_name="Test User", password="   "
+            email="test@example.com", full_name=full_name, password=password
         )
 
         with pytest.raises(HTTPException) as exc_info:
             await user_service.create_user(db_session, user_in=user_data)
 
         assert exc_info.value.status_code == 400
-        assert "Password is required" in exc_info.value.detail
-
-    async def test_create_user_trims_whitespace(self, db_session: AsyncSession):
-        """Test that user creation trims whitespace from email and full_name."""
-        user_data = UserCreate(
-            email="  test@example.com  ",
-            full_name="  Test User  ",
-            password="password123",
-        )
-
-        created_user = await user_service.create_user(db_session, user_in=user_data)
-
-        assert created_user.email == "test@example.com"  # Trimmed
-        assert created_user.full_name == "Test User"  # Trimmed
+        assert detail in exc_info.value.detail
 
-    @patch("app.services.user.hash_password")
     async def test_create_user_password_hashing_failure(
-        self, mock_hash_password, db_session: AsyncSession, user_create_data: dict
+        self, monkeypatch, db_session: AsyncSession, user_create_model: UserCreate
     ):
         """Test user creation when password hashing fails."""
-        mock_hash_password.side_effect = Exception("Hashing failed")
-        user_data = UserCreate(**user_create_data)
+
+        def failing_hash(password: str) -> str:
+            raise Exception("Hashing failed")
+
+        monkeypatch.setattr("app.services.user.hash_password", failing_hash)
+        user_data = user_create_model
 
         with pytest.raises(HTTPException) as exc_info:
             await user_service.create_user(db_session, user_in=user_data)
@@ -137,13 +133,16 @@ class TestUserService:
         assert exc_info.value.status_code == 500
         assert "Failed to hash password" in exc_info.value.detail
 
-    @patch("app.crud.user.user.create")
     async def test_create_user_database_failure(
-        self, mock_create, db_session: AsyncSession, user_create_data: dict
+        self, monkeypatch, db_session: AsyncSession, user_create_model: UserCreate
     ):
         """Test user creation when database operation fails."""
-        mock_create.side_effect = Exception("Database error")
-        user_data = UserCreate(**user_create_data)
+
+        async def failing_create(*args, **kwargs):
+            raise Exception("Database error")
+
+        monkeypatch.setattr("app.crud.user.user.create", failing_create)
+        user_data = user_create_model
 
         with pytest.raises(HTTPException) as exc_info:
             await user_service.create_user(db_session, user_in=user_data)
@@ -151,13 +150,15 @@ class TestUserService:
         assert exc_info.value.status_code == 500
         assert "Failed to create user" in exc_info.value.detail
 
-    async def test_update_user_success(self, db_session: AsyncSession, test_user: User):
+    async def test_update_user_success(
+        self, db_session: AsyncSession, test_user: User, test_user_id: str
+    ):
         """Test successful user update."""
         update_data = UserUpdate(full_name="Updated Name", email="updated@example.com")
 
         updated_user = await user_service.update_user(
             db_session,
-            user_id=str(test_user.id),
+            user_id=test_user_id,
             user_in=update_data,
             current_user=test_user,
         )
@@ -169,9 +170,7 @@ class TestUserService:
         self, db_session: AsyncSession, test_user: User
     ):
         """Test updating a non-existent user fails."""
-        import uuid
-
-        fake_id = str(uuid.uuid4())
+        fake_id = _UNKNOWN_USER_ID
         update_data = UserUpdate(full_name="Updated Name")
 
         with pytest.raises(HTTPException) as exc_info:
@@ -183,11 +182,11 @@ class TestUserService:
         assert "User not found" in exc_info.value.detail
 
     async def test_get_user_profile_success(
-        self, db_session: AsyncSession, test_user: User
+        self, db_session: AsyncSession, test_user: User, test_user_id: str
     ):
         """Test successful user profile retrieval."""
         profile = await user_service.get_user_profile(
-            db_session, user_id=str(test_user.id), requesting_user=test_user
+            db_session, user_id=test_user_id, requesting_user=test_user
         )
 
         assert profile.id == test_user.id
@@ -198,9 +197,7 @@ class TestUserService:
         self, db_session: AsyncSession, test_user: User
     ):
         """Test getting profile for non-existent user fails."""
-        import uuid
-
-        fake_id = str(uuid.uuid4())
+        fake_id = _UNKNOWN_USER_ID
 
         with pytest.raises(HTTPException) as exc_info:
             await user_service.get_user_profile(
@@ -210,43 +207,61 @@ class TestUserService:
         assert exc_info.value.status_code == 404
         assert "User not found" in exc_info.value.detail
 
+    async def test_malformed_user_id_is_not_found(
+        self, db_session: AsyncSession, test_user: User
+    ):
+        """Test that a malformed user id is reported as not found, not a 500."""
+        with pytest.raises(HTTPException) as exc_info:
+            await user_service.get_user_profile(
+                db_session, user_id="not-a-uuid", requesting_user=test_user
+            )
+        assert exc_info.value.status_code == 404
+
+        with pytest.raises(HTTPException) as exc_info:
+            await user_service.update_user(
+                db_session,
+                user_id="not-a-uuid",
+                user_in=UserUpdate(full_name="Updated Name"),
+                current_user=test_user,
+            )
+        assert exc_info.value.status_code == 404
+
 
 @pytest.mark.integration
 @pytest.mark.asyncio
 class TestUserServiceIntegration:
     """Test user service integration with logging and audit."""
 
-    @patch("app.core.logging.audit.log_security_event")
-    @patch("app.core.logging.audit.log_user_action")
     async def test_create_user_audit_logging(
         self,
-        mock_log_user_action,
-        mock_log_security_event,
-        db_session: AsyncSession,
-        user_create_data: dict,
+        fast_crud: User,
+        user_create_model: UserCreate,
+        audit_calls: dict[str, CallRecorder],
     ):
         """Test that user creation triggers proper audit logging."""
-        user_data = UserCreate(**user_create_data)
+        user_data = user_create_model
 
-        created_user = await user_service.create_user(db_session, user_in=user_data)
+        created_user = await user_service.create_user(None, user_in=user_data)
 
         # Verify audit logs were called
-        mock_log_user_action.assert_called()
-        mock_log_security_event.assert_called()
+        assert audit_calls["log_user_action"].calls
+        assert audit_calls["log_security_event"].calls
 
         # Check the log_user_action call
-        user_action_call = mock_log_user_action.call_args
-        assert user_action_call[1]["user_id"] == str(created_user.id)
-        assert user_action_call[1]["action"] == "user_registration"
+        _, user_action_call = audit_calls["log_user_action"].calls[-1]
+        assert user_action_call["user_id"] == str(created_user.id)
+        assert user_action_call["action"] == "user_registration"
 
         # Check the log_security_event call
-        security_event_call = mock_log_security_event.call_args
-        assert security_event_call[0][0] == "user_registration"
-        assert security_event_call[1]["severity"] == "info"
+        args, kwargs = audit_calls["log_security_event"].calls[-1]
+        assert args[0] == "user_registration"
+        assert kwargs["severity"] == "info"
 
-    @patch("app.core.logging.audit.log_security_event")
     async def test_create_user_duplicate_email_audit(
-        self, mock_log_security_event, db_session: AsyncSession, test_user: User
+        self,
+        db_session: AsyncSession,
+        test_user: User,
+        audit_calls: dict[str, CallRecorder],
     ):
         """Test that duplicate email attempts trigger security logging."""
         user_data = UserCreate(
@@ -257,67 +272,59 @@ class TestUserServiceIntegration:
             await user_service.create_user(db_session, user_in=user_data)
 
         # Verify security event was logged
-        mock_log_security_event.assert_called()
-        security_event_call = mock_log_security_event.call_args
-        assert security_event_call[0][0] == "duplicate_user_registration"
-        assert security_event_call[1]["severity"] == "low"
+        assert audit_calls["log_security_event"].calls
+        args, kwargs = audit_calls["log_security_event"].calls[-1]
+        assert args[0] == "duplicate_user_registration"
+        assert kwargs["severity"] == "low"
 
-    @patch("app.core.logging.audit.log_user_action")
     async def test_update_user_audit_logging(
-        self, mock_log_user_action, db_session: AsyncSession, test_user: User
+        self, fast_crud: User, audit_calls: dict[str, CallRecorder]
     ):
         """Test that user updates trigger proper audit logging."""
         update_data = UserUpdate(full_name="Updated Name")
 
         await user_service.update_user(
-            db_session,
-            user_id=str(test_user.id),
+            None,
+            user_id=str(fast_crud.id),
             user_in=update_data,
-            current_user=test_user,
+            current_user=fast_crud,
         )
 
         # Verify audit log was called
-        mock_log_user_action.assert_called()
-        user_action_call = mock_log_user_action.call_args
-        assert user_action_call[1]["user_id"] == str(test_user.id)
-        assert user_action_call[1]["action"] == "user_update"
+        assert audit_calls["log_user_action"].calls
+        _, user_action_call = audit_calls["log_user_action"].calls[-1]
+        assert user_action_call["user_id"] == str(fast_crud.id)
+        assert user_action_call["action"] == "user_update"
 
-    @patch("app.core.logging.audit.log_data_access")
     async def test_get_user_profile_audit_logging(
-        self, mock_log_data_access, db_session: AsyncSession, test_user: User
+        self,
+        db_session: AsyncSession,
+        test_user: User,
+        test_user_id: str,
+        audit_calls: dict[str, CallRecorder],
     ):
         """Test that profile access triggers data access logging."""
         await user_service.get_user_profile(
-            db_session, user_id=str(test_user.id), requesting_user=test_user
+            db_session, user_id=test_user_id, requesting_user=test_user
         )
 
         # Verify data access was logged
-        mock_log_data_access.assert_called()
-        data_access_call = mock_log_data_access.call_args
-        assert data_access_call[1]["user_id"] == str(test_user.id)
-        assert data_access_call[1]["resource_type"] == "user_profile"
-        assert data_access_call[1]["operation"] == "read"
-
-    @patch("app.services.user.logger")
-    async def test_service_performance_logging(
-        self, mock_logger, db_session: AsyncSession, user_create_data: dict
-    ):
-        """Test that service operations trigger performance logging."""
-        user_data = UserCreate(**user_create_data)
+        assert audit_calls["log_data_access"].calls
+        _, data_access_call = audit_calls["log_data_access"].calls[-1]
+        assert data_access_call["user_id"] == test_user_id
+        assert data_access_call["resource_type"] == "user_profile"
+        assert data_access_call["operation"] == "read"
 
-        # The @log_performance decorator should log performance metrics
-        await user_service.create_user(db_session, user_in=user_data)
 
-        # Verify logger was called (since the service has multiple log calls)
-        assert mock_logger.info.called
+@pytest.mark.unit
+class TestUserServiceWiring:
+    """Test how the service methods are decorated."""
 
-    async def test_user_service_error_handling(self, db_session: AsyncSession):
-        """Test comprehensive error handling in user service."""
+    @pytest.mark.parametrize(
+        "method_name", ["create_user", "update_user", "get_user_profile"]
+    )
+    def test_service_has_log_performance_decorator(self, method_name: str):
+        """Test that service operations are wrapped by @log_performance."""
+        method = getattr(user_service, method_name)
 
-        # Test invalid email format - this should fail at Pydantic level
-        with pytest.raises(ValidationError):
-            UserCreate(email="invalid-email", full_name="Test", password="pass")
-
-        # Test completely empty email - this should also fail
-        with pytest.raises(ValidationError):
-            UserCreate(email="", full_name="Test", password="pass")
+        assert method.log_performance_name == f"user_service.{method_name}"